@@ -4,13 +4,20 @@ Sun position calculator for blinds automation.
 Calculates solar azimuth and altitude for a given location and time.
 """
 
+import atexit
 import json
 import math
+import os
 import plistlib
-import urllib.error
-import urllib.request
-from datetime import datetime, timezone
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from datetime import datetime, timedelta, tzinfo
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
@@ -22,8 +29,21 @@ from zoneinfo import ZoneInfo
 # Run "python3 sun_position.py config" to view current settings
 
 CONFIG_FILE = Path.home() / "Library" / "Preferences" / "com.blinds.plist"
+CACHE_DIR = Path.home() / "Library" / "Caches" / "com.blinds"
+CONFIG_CACHE_FILE = CACHE_DIR / "config.json"
+ELEVATION_CACHE_FILE = CACHE_DIR / "elevations.json"
+STATE_FILE = CACHE_DIR / "state.json"
+YEARLY_CACHE_FILE = CACHE_DIR / "yearly.json"
 HORIZON_PROFILE_FILE = Path(__file__).parent / "horizon_profile.json"
 
+# Recommendations are evaluated once per interval (seconds), matching how
+# often the LaunchAgent runs "auto"
+RECOMMENDATION_INTERVAL = 300
+
+# "auto" skips the Shortcut while the step is unchanged, but re-sends it after
+# this many seconds in case the blinds were moved by hand
+SHORTCUT_REFRESH_INTERVAL = 3600
+
 # Default configuration values
 DEFAULT_CONFIG = {
     # Location
@@ -55,82 +75,337 @@ DEFAULT_CONFIG = {
     ],
 }
 
+# Freeze the defaults: every loaded config shares these values, so they must
+# not be mutable. Use dict(DEFAULT_CONFIG) to build an editable copy.
+DEFAULT_CONFIG["blind_steps"] = tuple(
+    MappingProxyType(step) for step in DEFAULT_CONFIG["blind_steps"]
+)
+DEFAULT_CONFIG["horizon_obstructions"] = tuple(DEFAULT_CONFIG["horizon_obstructions"])
+DEFAULT_CONFIG = MappingProxyType(DEFAULT_CONFIG)
+
 
 def load_config() -> dict:
-    """Load configuration from plist file, with defaults for missing values."""
-    config = DEFAULT_CONFIG.copy()
+    """
+    Load configuration from plist file, with defaults for missing values.
+
+    The parsed config is cached and only re-read when the file's mtime changes,
+    so treat the returned dict as read-only.
+    """
+    try:
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    return _load_config_cached(mtime)
+
 
-    if CONFIG_FILE.exists():
+@lru_cache(maxsize=1)
+def _load_config_cached(mtime: Optional[int]) -> dict:
+    """Parse the config file. Keyed on its mtime so external edits are picked up."""
+    if mtime is not None:
         try:
-            with open(CONFIG_FILE, "rb") as f:
-                user_config = plistlib.load(f)
-                config.update(user_config)
+            user_config = _read_config_cache(mtime)
+            if user_config is None:
+                with open(CONFIG_FILE, "rb") as f:
+                    user_config = plistlib.load(f)
+                _write_config_cache(user_config, mtime)
+            return {**DEFAULT_CONFIG, **user_config}
         except Exception as e:
-            print(f"Warning: Could not load config from {CONFIG_FILE}: {e}")
+            print(
+                f"Warning: Could not load config from {CONFIG_FILE}: {e}",
+                file=sys.stderr,
+            )
 
-    return config
+    return dict(DEFAULT_CONFIG)
+
+
+def _read_config_cache(mtime: int) -> Optional[dict]:
+    """Return the JSON copy of the config if it was made from this plist mtime."""
+    try:
+        with open(CONFIG_CACHE_FILE) as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    if not isinstance(data, dict) or data.get("mtime") != mtime:
+        return None
+    return data.get("config")
+
+
+def _write_config_cache(config: dict, mtime: int):
+    """
+    Save a JSON copy of the config, which is much cheaper to parse than the plist.
+    The plist stays the source of truth; the copy is ignored once its mtime is stale.
+    """
+    try:
+        _write_cache_file(
+            CONFIG_CACHE_FILE, json.dumps({"mtime": mtime, "config": config})
+        )
+    except (TypeError, ValueError, IOError):
+        pass  # Values JSON can't represent, or an unwritable cache dir
 
 
-def save_config(config: dict):
+def _write_cache_file(path: Path, text: str):
+    """
+    Replace a cache file atomically, so a concurrent run (cron and a manual
+    command, say) reads either the old or the new contents, never half a file.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def save_config(config: Mapping):
     """Save configuration to plist file."""
+    config = _plain(config)
     CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(CONFIG_FILE, "wb") as f:
         plistlib.dump(config, f)
+    _write_config_cache(config, CONFIG_FILE.stat().st_mtime_ns)
+    _load_config_cached.cache_clear()
+
+
+def _plain(value):
+    """Turn frozen mappings and tuples back into plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
 
 
 def get_config_value(key: str, default=None):
-    """Get a single config value."""
-    config = load_config()
-    return config.get(key, default)
+    """Get a single value from the loaded config."""
+    return _config.get(key, default)
+
+
+def reload_config() -> dict:
+    """Re-read the config file and refresh the module-level settings."""
+    global _config
+    _config = load_config()
+    _apply_config(_config)
+    return _config
+
+
+# Terrain lookup tables have one bucket per 0.1° of azimuth
+_BUCKETS_PER_DEGREE = 10
+_AZIMUTH_BUCKETS = 360 * _BUCKETS_PER_DEGREE
+
+# 16-point compass rose (defined here because _apply_config() labels the room)
+_COMPASS_POINTS = (
+    "N",
+    "NNE",
+    "NE",
+    "ENE",
+    "E",
+    "ESE",
+    "SE",
+    "SSE",
+    "S",
+    "SSW",
+    "SW",
+    "WSW",
+    "W",
+    "WNW",
+    "NW",
+    "NNW",
+)
+
+# Compass point for each quarter degree of azimuth. Sector edges (11.25° + k·22.5°)
+# fall on bucket boundaries, so every bucket maps to exactly one point.
+_COMPASS_LUT = tuple(
+    _COMPASS_POINTS[round((i + 0.5) / 4 / 22.5) % 16] for i in range(360 * 4)
+)
+
+
+def compass_direction(azimuth: float) -> str:
+    """Convert azimuth to compass direction."""
+    return _COMPASS_LUT[math.floor(azimuth * 4) % 1440]
+
+
+def _derive_setting(config: dict, key: str, derive, fallback):
+    """
+    Return derive(config[key]), or fallback if the value can't be used. A bad
+    value only warns here, so modes like 'help' and 'config' still run.
+    """
+    try:
+        return derive(config[key])
+    except (KeyError, TypeError, ValueError) as e:
+        _warn_invalid_setting(key, e)
+        return fallback
+
+
+def _warn_invalid_setting(key: str, error: Exception):
+    """Report an unusable config value on stderr."""
+    print(f"Warning: Invalid {key} in {CONFIG_FILE}: {error}", file=sys.stderr)
+
+
+def _is_obstruction(entry) -> bool:
+    """True if a horizon_obstructions entry has all three fields as numbers."""
+    if not isinstance(entry, Mapping):
+        return False
+    values = [
+        entry.get(key) for key in ("azimuth_start", "azimuth_end", "min_altitude")
+    ]
+    return all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in values
+    )
+
+
+class _UnknownZone(tzinfo):
+    """
+    Stands in for a configured timezone that doesn't exist. Modes that never
+    need local time ('help', 'config', ...) still run; anything that does
+    raises the original lookup error, rather than using some other zone.
+    """
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def utcoffset(self, dt):
+        raise self.error
+
+    dst = tzname = utcoffset
+
+
+def _apply_config(config: dict):
+    """Derive the module-level settings below from a loaded config."""
+    global LATITUDE, LONGITUDE, ELEVATION, TIMEZONE, _TZ, _SIN_LAT, _COS_LAT
+    global WINDOW_AZIMUTH, MONITOR_FACING, USER_FACING, HORIZON_OBSTRUCTIONS
+    global _WINDOW_COMPASS, _MONITOR_COMPASS, _USER_COMPASS
+    global DAY_BLIND_MIN_OPEN, DAY_BLIND_MAX_OPEN
+    global GLARE_THRESHOLD_LOW, GLARE_THRESHOLD_HIGH, GLARE_RESPONSE_CURVE
+    global BLIND_SHORTCUT, BLIND_STEPS, VALID_STEPS
+    global _OBSTRUCTION_LUT, _HORIZON_LUT, _HORIZON_LUT_PROFILE
+    global _STEP_BY_NAME, _STEP_THRESHOLDS, _STEP_NAMES
+
+    LATITUDE = config["latitude"]
+    LONGITUDE = config["longitude"]
+    _SIN_LAT, _COS_LAT = _derive_setting(
+        config,
+        "latitude",
+        lambda lat: (math.sin(math.radians(lat)), math.cos(math.radians(lat))),
+        (None, None),
+    )
+    ELEVATION = config["elevation"]
+    TIMEZONE = config["timezone"]
+    try:
+        _TZ = ZoneInfo(TIMEZONE)
+    except (KeyError, TypeError, ValueError) as e:  # KeyError: ZoneInfoNotFoundError
+        _warn_invalid_setting("timezone", e)
+        _TZ = _UnknownZone(e)
+    WINDOW_AZIMUTH = config["window_azimuth"]
+    MONITOR_FACING = config["monitor_facing"]
+    USER_FACING = config["user_facing"]
+    _WINDOW_COMPASS = _derive_setting(config, "window_azimuth", compass_direction, "?")
+    _MONITOR_COMPASS = _derive_setting(config, "monitor_facing", compass_direction, "?")
+    _USER_COMPASS = _derive_setting(config, "user_facing", compass_direction, "?")
+
+    # Entries the lookup table can't be built from are skipped with a warning
+    HORIZON_OBSTRUCTIONS = []
+    for o in config.get("horizon_obstructions", []):
+        if not _is_obstruction(o):
+            _warn_invalid_setting(
+                "horizon_obstructions",
+                f"skipping {o!r}; entries need numeric azimuth_start, "
+                "azimuth_end and min_altitude",
+            )
+            continue
+        HORIZON_OBSTRUCTIONS.append(
+            (o["azimuth_start"], o["azimuth_end"], o["min_altitude"])
+        )
+
+    # Ranges that wrap around 360° are split in two plain intervals
+    spans = []
+    for az_start, az_end, min_alt in HORIZON_OBSTRUCTIONS:
+        if az_start <= az_end:
+            spans.append((az_start, az_end, min_alt))
+        else:
+            spans.append((az_start, 360, min_alt))
+            spans.append((0, az_end, min_alt))
+
+    # Rasterize into a per-bucket minimum visible altitude so the terrain
+    # check is a single index instead of a scan over every obstruction
+    _OBSTRUCTION_LUT = array("d", [-90.0]) * _AZIMUTH_BUCKETS
+    for az_start, az_end, min_alt in spans:
+        first = int(az_start * _BUCKETS_PER_DEGREE)
+        last = min(int(az_end * _BUCKETS_PER_DEGREE), _AZIMUTH_BUCKETS - 1)
+        for i in range(first, last + 1):
+            if min_alt > _OBSTRUCTION_LUT[i]:
+                _OBSTRUCTION_LUT[i] = min_alt
+    _HORIZON_LUT = None  # Merged with the horizon profile on first use
+    _HORIZON_LUT_PROFILE = None
+
+    # -------------------------------------------------------------------------
+    # BLIND SETTINGS (loaded from config)
+    # -------------------------------------------------------------------------
+    DAY_BLIND_MIN_OPEN = config["day_blind_min_open"]
+    DAY_BLIND_MAX_OPEN = config["day_blind_max_open"]
+    GLARE_THRESHOLD_LOW = config["glare_threshold_low"]
+    GLARE_THRESHOLD_HIGH = config["glare_threshold_high"]
+    GLARE_RESPONSE_CURVE = config["glare_response_curve"]
+
+    # Shortcuts integration (steps sorted by threshold so get_blind_step() can bisect)
+    BLIND_SHORTCUT = config["blind_shortcut"]
+    _STEP_BY_NAME = {s["name"]: s["threshold"] for s in config["blind_steps"]}
+    VALID_STEPS = _STEP_BY_NAME.keys()
+    BLIND_STEPS = sorted(
+        ((threshold, name) for name, threshold in _STEP_BY_NAME.items()),
+        key=lambda step: step[0],
+    )
+    _STEP_THRESHOLDS = [threshold for threshold, _ in BLIND_STEPS]
+    _STEP_NAMES = [name for _, name in BLIND_STEPS]
 
 
 # Load config at module level for convenience
 _config = load_config()
-
-LATITUDE = _config["latitude"]
-LONGITUDE = _config["longitude"]
-ELEVATION = _config["elevation"]
-TIMEZONE = _config["timezone"]
-WINDOW_AZIMUTH = _config["window_azimuth"]
-MONITOR_FACING = _config["monitor_facing"]
-USER_FACING = _config["user_facing"]
-HORIZON_OBSTRUCTIONS = [
-    (o["azimuth_start"], o["azimuth_end"], o["min_altitude"])
-    for o in _config.get("horizon_obstructions", [])
-]
-
-# -----------------------------------------------------------------------------
-# BLIND SETTINGS (loaded from config)
-# -----------------------------------------------------------------------------
-DAY_BLIND_MIN_OPEN = _config["day_blind_min_open"]
-DAY_BLIND_MAX_OPEN = _config["day_blind_max_open"]
-GLARE_THRESHOLD_LOW = _config["glare_threshold_low"]
-GLARE_THRESHOLD_HIGH = _config["glare_threshold_high"]
-GLARE_RESPONSE_CURVE = _config["glare_response_curve"]
-
-# Shortcuts integration
-BLIND_SHORTCUT = _config["blind_shortcut"]
-BLIND_STEPS = [(s["threshold"], s["name"]) for s in _config["blind_steps"]]
-VALID_STEPS = {s["name"] for s in _config["blind_steps"]}
+_apply_config(_config)
 
 # =============================================================================
 
 
 def julian_day(dt: datetime) -> float:
     """Calculate Julian Day from datetime."""
-    year = dt.year
-    month = dt.month
-    day = dt.day + dt.hour / 24 + dt.minute / 1440 + dt.second / 86400
+    # Gregorian calendar day number (Fliegel-Van Flandern). Integer-only: the
+    # January/February shift is folded into a, so there is no month branch.
+    a = (14 - dt.month) // 12
+    year = dt.year + 4800 - a
+    month = dt.month + 12 * a - 3
+    jdn = (
+        dt.day
+        + (153 * month + 2) // 5
+        + 365 * year
+        + year // 4
+        - year // 100
+        + year // 400
+        - 32045
+    )
+
+    # The day number refers to noon; the time of day is summed in whole
+    # seconds so it takes a single (correctly rounded) division
+    seconds_from_noon = (dt.hour - 12) * 3600 + dt.minute * 60 + dt.second
+    return jdn + seconds_from_noon / 86400
 
-    if month <= 2:
-        year -= 1
-        month += 12
 
-    a = int(year / 100)
-    b = 2 - a + int(a / 4)
+# Julian Day of the Unix epoch (1970-01-01 00:00 UTC)
+_JD_UNIX_EPOCH = 2440587.5
 
-    jd = int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) + day + b - 1524.5
-    return jd
+# sun_position() rounds times down to this many seconds so repeated calls
+# within the same interval are served from a cache
+SUN_POSITION_RESOLUTION = 60
+
+
+def _local_to_jd(dt: datetime) -> float:
+    """
+    Calculate Julian Day from an aware datetime in any timezone.
+    Goes through the POSIX timestamp, so no UTC datetime or calendar math is needed.
+    """
+    return _JD_UNIX_EPOCH + dt.timestamp() / 86400
 
 
 def sun_position(dt: datetime, lat: float, lon: float) -> tuple[float, float]:
@@ -142,13 +417,137 @@ def sun_position(dt: datetime, lat: float, lon: float) -> tuple[float, float]:
                azimuth: 0=North, 90=East, 180=South, 270=West
                altitude: 0=horizon, 90=zenith
     """
-    # Convert to UTC for calculations
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=ZoneInfo(TIMEZONE))
-    dt_utc = dt.astimezone(timezone.utc)
+        dt = dt.replace(tzinfo=_TZ)
+    step = int(dt.timestamp() // SUN_POSITION_RESOLUTION)
+    return _sun_position_cached(step, lat, lon)
+
+
+@lru_cache(maxsize=4096)
+def _sun_position_cached(step: int, lat: float, lon: float) -> Tuple[float, float]:
+    """Sun position at a whole number of SUN_POSITION_RESOLUTION steps."""
+    jd = _JD_UNIX_EPOCH + step * SUN_POSITION_RESOLUTION / 86400
+    sin_lat, cos_lat = _latitude_terms(lat)
+    return _sun_position_jd(jd, lon, sin_lat, cos_lat)
 
-    jd = julian_day(dt_utc)
 
+def sun_position_batch(
+    times: List[datetime], lat: float, lon: float
+) -> Tuple[List[float], List[float]]:
+    """
+    Calculate sun positions for many times at one location.
+    Location terms are computed once for the whole batch.
+
+    Returns:
+        tuple: (azimuths, altitudes) as lists of degrees, in the order of times
+    """
+    jds = [
+        _local_to_jd(dt if dt.tzinfo is not None else dt.replace(tzinfo=_TZ))
+        for dt in times
+    ]
+    return sun_position_batch_jd(jds, lat, lon)
+
+
+def sun_position_batch_jd(
+    jds: List[float], lat: float, lon: float
+) -> Tuple[List[float], List[float]]:
+    """sun_position_batch() for times already given as Julian Days."""
+    sin_lat, cos_lat = _latitude_terms(lat)
+    if not jds:
+        return [], []
+
+    # RA and declination are near-linear over a day (interpolation error
+    # ~0.001° at most), so batches spanning up to a day only evaluate the
+    # full solar ephemeris at their two ends. Sidereal time is linear too,
+    # leaving only the hour angle and alt/az to work out per sample.
+    first, last = min(jds), max(jds)
+    if last - first > 1:
+        return _unzip([_sun_position_jd(jd, lon, sin_lat, cos_lat) for jd in jds])
+
+    ra0, dec0 = solar_ephemeris(first)
+    ra1, dec1 = solar_ephemeris(last)
+    ra1 += round((ra0 - ra1) / math.tau) * math.tau  # Don't interpolate across ±180°
+    span = (last - first) or 1.0
+    ra_rate = (ra1 - ra0) / span
+    dec_rate = (dec1 - dec0) / span
+    lst0 = _sidereal_time(first) + lon
+
+    azimuths, altitudes = [], []
+    for jd in jds:
+        days = jd - first
+        lst = math.radians((lst0 + _SIDEREAL_DEGREES_PER_DAY * days) % 360)
+        azimuth, altitude = _hour_angle_altaz(
+            lst - (ra0 + ra_rate * days), dec0 + dec_rate * days, sin_lat, cos_lat
+        )
+        azimuths.append(azimuth)
+        altitudes.append(altitude)
+    return azimuths, altitudes
+
+
+def approx_sunrise(
+    date: datetime, lat: float, lon: float, altitude: float = -0.833
+) -> Optional[datetime]:
+    """
+    Approximate time the sun rises through altitude (degrees) on date's day.
+    Two ephemeris evaluations (local noon, then the first estimate); good to a
+    couple of minutes even at high latitudes.
+
+    Returns:
+        Aware datetime in date's timezone, or None if the sun doesn't cross
+        that altitude that day (polar day or night)
+    """
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=_TZ)
+    sin_lat, cos_lat = _latitude_terms(lat)
+    sin_alt = math.sin(math.radians(altitude))
+
+    jd = _local_to_jd(date.replace(hour=12, minute=0, second=0, microsecond=0))
+    for _ in range(2):
+        ra, declination = solar_ephemeris(jd)
+        sin_dec, cos_dec = _sincos(declination)
+
+        # Hour angle at which the sun sits at the requested altitude
+        cos_h0 = (sin_alt - sin_lat * sin_dec) / (cos_lat * cos_dec)
+        if not -1 <= cos_h0 <= 1:
+            return None
+
+        # Step from the current hour angle (wrapped to ±180°) back to -h0
+        ha = (_sidereal_time(jd) + lon - math.degrees(ra) + 180) % 360 - 180
+        jd -= (ha + math.degrees(math.acos(cos_h0))) / _SIDEREAL_DEGREES_PER_DAY
+
+    return datetime.fromtimestamp((jd - _JD_UNIX_EPOCH) * 86400, tz=date.tzinfo)
+
+
+def _unzip(positions: List[Tuple[float, float]]) -> Tuple[List[float], List[float]]:
+    """Split [(az, alt), ...] into parallel azimuth and altitude lists."""
+    return [az for az, _ in positions], [alt for _, alt in positions]
+
+
+def _latitude_terms(lat: float) -> Tuple[float, float]:
+    """Sine and cosine of a latitude (precomputed for the configured location)."""
+    if lat == LATITUDE:
+        return _SIN_LAT, _COS_LAT
+    return _sincos(math.radians(lat))
+
+
+def _sincos(x: float) -> Tuple[float, float]:
+    """Sine and cosine of x (radians), for angles whose sin and cos are both used."""
+    return math.sin(x), math.cos(x)
+
+
+def _sun_position_jd(
+    jd: float, lon: float, sin_lat: float, cos_lat: float
+) -> Tuple[float, float]:
+    """Sun (azimuth, altitude) in degrees at a Julian Day; see sun_position()."""
+    ra, declination = solar_ephemeris(jd)
+    return _sun_altaz(jd, ra, declination, lon, sin_lat, cos_lat)
+
+
+def solar_ephemeris(jd: float) -> Tuple[float, float]:
+    """
+    Calculate the sun's right ascension and declination (radians) at a Julian Day.
+    These drift slowly (~1° and <0.4° per day), unlike the hour angle.
+    """
     # Julian centuries from J2000.0
     t = (jd - 2451545.0) / 36525.0
 
@@ -158,13 +557,15 @@ def sun_position(dt: datetime, lat: float, lon: float) -> tuple[float, float]:
 
     # Mean anomaly of the sun
     m = (357.52911 + 35999.05029 * t - 0.0001537 * t**2) % 360
-    m_rad = math.radians(m)
+    sin_m, cos_m = _sincos(math.radians(m))
 
-    # Equation of center
+    # Equation of center (sin 2m and sin 3m from the multiple-angle identities)
+    sin_2m = 2.0 * sin_m * cos_m
+    sin_3m = sin_m * (3.0 - 4.0 * sin_m * sin_m)
     c = (
-        (1.914602 - 0.004817 * t - 0.000014 * t**2) * math.sin(m_rad)
-        + (0.019993 - 0.000101 * t) * math.sin(2 * m_rad)
-        + 0.000289 * math.sin(3 * m_rad)
+        (1.914602 - 0.004817 * t - 0.000014 * t**2) * sin_m
+        + (0.019993 - 0.000101 * t) * sin_2m
+        + 0.000289 * sin_3m
     )
 
     # Sun's true longitude
@@ -176,80 +577,76 @@ def sun_position(dt: datetime, lat: float, lon: float) -> tuple[float, float]:
 
     # Obliquity of ecliptic
     obliquity = 23.439291 - 0.0130042 * t
-    obliquity_rad = math.radians(obliquity)
+    sin_obl, cos_obl = _sincos(math.radians(obliquity))
 
     # Sun's right ascension and declination
-    sun_apparent_lon_rad = math.radians(sun_apparent_lon)
+    sin_lam, cos_lam = _sincos(math.radians(sun_apparent_lon))
+
+    ra = math.atan2(cos_obl * sin_lam, cos_lam)
+
+    declination = math.asin(sin_obl * sin_lam)
+
+    return ra, declination
 
-    ra = math.atan2(
-        math.cos(obliquity_rad) * math.sin(sun_apparent_lon_rad),
-        math.cos(sun_apparent_lon_rad),
-    )
 
-    declination = math.asin(math.sin(obliquity_rad) * math.sin(sun_apparent_lon_rad))
+# Mean rate of Greenwich sidereal time
+_SIDEREAL_DEGREES_PER_DAY = 360.98564736629
 
-    # Greenwich Mean Sidereal Time
-    gmst = (
+
+def _sidereal_time(jd: float) -> float:
+    """Greenwich Mean Sidereal Time in degrees at a Julian Day."""
+    t = (jd - 2451545.0) / 36525.0
+    return (
         280.46061837
-        + 360.98564736629 * (jd - 2451545.0)
+        + _SIDEREAL_DEGREES_PER_DAY * (jd - 2451545.0)
         + 0.000387933 * t**2
         - t**3 / 38710000
     ) % 360
 
+
+def _sun_altaz(
+    jd: float,
+    ra: float,
+    declination: float,
+    lon: float,
+    sin_lat: float,
+    cos_lat: float,
+) -> Tuple[float, float]:
+    """Sun (azimuth, altitude) in degrees from its RA/declination at a Julian Day."""
     # Local Sidereal Time
-    lst = math.radians((gmst + lon) % 360)
+    lst = math.radians((_sidereal_time(jd) + lon) % 360)
 
-    # Hour angle
-    ha = lst - ra
+    return _hour_angle_altaz(lst - ra, declination, sin_lat, cos_lat)
 
-    # Convert latitude to radians
-    lat_rad = math.radians(lat)
+
+def _hour_angle_altaz(
+    hour_angle: float, declination: float, sin_lat: float, cos_lat: float
+) -> Tuple[float, float]:
+    """Sun (azimuth, altitude) in degrees from its hour angle and declination."""
+    sin_ha, cos_ha = _sincos(hour_angle)
+    sin_dec, cos_dec = _sincos(declination)
 
     # Altitude (elevation)
-    sin_alt = math.sin(lat_rad) * math.sin(declination) + math.cos(lat_rad) * math.cos(
-        declination
-    ) * math.cos(ha)
+    sin_alt = sin_lat * sin_dec + cos_lat * cos_dec * cos_ha
     altitude = math.degrees(math.asin(sin_alt))
 
-    # Azimuth
-    cos_az = (math.sin(declination) - math.sin(lat_rad) * sin_alt) / (
-        math.cos(lat_rad) * math.cos(math.asin(sin_alt))
-    )
+    # Azimuth (cos(alt) = sqrt(1 - sin²(alt)) since alt is within ±90°)
+    cos_alt = math.sqrt(max(0.0, 1.0 - sin_alt * sin_alt))
+    denominator = cos_lat * cos_alt
+    if denominator == 0.0:  # Sun exactly at the zenith: azimuth is undefined
+        return 0.0, altitude
+    cos_az = (sin_dec - sin_lat * sin_alt) / denominator
     cos_az = max(-1, min(1, cos_az))  # Clamp to [-1, 1]
 
     azimuth = math.degrees(math.acos(cos_az))
 
     # Adjust azimuth based on hour angle
-    if math.sin(ha) > 0:
+    if sin_ha > 0:
         azimuth = 360 - azimuth
 
     return azimuth, altitude
 
 
-def compass_direction(azimuth: float) -> str:
-    """Convert azimuth to compass direction."""
-    directions = [
-        "N",
-        "NNE",
-        "NE",
-        "ENE",
-        "E",
-        "ESE",
-        "SE",
-        "SSE",
-        "S",
-        "SSW",
-        "SW",
-        "WSW",
-        "W",
-        "WNW",
-        "NW",
-        "NNW",
-    ]
-    index = round(azimuth / 22.5) % 16
-    return directions[index]
-
-
 def angle_difference(a1: float, a2: float) -> float:
     """Calculate the smallest angle between two azimuths."""
     diff = abs(a1 - a2) % 360
@@ -259,42 +656,86 @@ def angle_difference(a1: float, a2: float) -> float:
 def is_sun_blocked_by_terrain(sun_az: float, sun_alt: float) -> bool:
     """
     Check if sun is blocked by terrain obstructions (hills, buildings).
-    First checks auto-calculated horizon profile, then falls back to manual HORIZON_OBSTRUCTIONS.
+    Uses the auto-calculated horizon profile combined with manual HORIZON_OBSTRUCTIONS.
     """
-    # Try auto-calculated horizon profile first
+    return sun_alt < horizon_at(sun_az)
+
+
+def horizon_at(azimuth: float) -> float:
+    """Minimum sun altitude (degrees) that clears the terrain at an azimuth."""
+    return _horizon_lut()[_azimuth_bucket(azimuth)]
+
+
+def _horizon_lut() -> array:
+    """
+    Terrain lookup table for the current horizon profile, rebuilt when the
+    profile file changes. Checking costs a stat(), so loops fetch the table
+    once and index it per sample.
+    """
+    global _HORIZON_LUT, _HORIZON_LUT_PROFILE
     horizon = load_horizon_profile()
-    if horizon:
-        # Find the closest azimuth in the profile
-        az_key = str(round(sun_az / 5) * 5 % 360)  # Round to nearest 5°
-        if az_key in horizon:
-            horizon_alt = horizon[az_key]
-            if sun_alt < horizon_alt:
-                return True
-            return False  # Sun is above horizon profile
-
-    # Fall back to manual obstructions
-    for az_start, az_end, min_alt in HORIZON_OBSTRUCTIONS:
-        # Handle ranges that wrap around 360°
-        if az_start <= az_end:
-            in_range = az_start <= sun_az <= az_end
-        else:
-            in_range = sun_az >= az_start or sun_az <= az_end
+    if _HORIZON_LUT is None or horizon is not _HORIZON_LUT_PROFILE:
+        _HORIZON_LUT = _build_horizon_lut(horizon)
+        _HORIZON_LUT_PROFILE = horizon
+    return _HORIZON_LUT
+
 
-        if in_range and sun_alt < min_alt:
-            return True
-    return False
+def _azimuth_bucket(azimuth: float) -> int:
+    """Index of an azimuth in the terrain lookup tables."""
+    return int(azimuth * _BUCKETS_PER_DEGREE) % _AZIMUTH_BUCKETS
+
+
+def _build_horizon_lut(horizon: Optional[Dict]) -> array:
+    """
+    Merge the horizon profile into the manual obstruction table, keeping the
+    higher of the two in each azimuth bucket.
+    """
+    lut = array("d", _OBSTRUCTION_LUT)
+    if horizon:
+        # Each profile sample covers the azimuths that round to it (±2.5°)
+        half_width = round(2.5 * _BUCKETS_PER_DEGREE)
+        for az_key, horizon_alt in horizon.items():
+            center = round(float(az_key) * _BUCKETS_PER_DEGREE)
+            for i in range(center - half_width, center + half_width):
+                i %= _AZIMUTH_BUCKETS
+                if horizon_alt > lut[i]:
+                    lut[i] = horizon_alt
+    return lut
 
 
 def load_horizon_profile() -> Optional[Dict]:
-    """Load cached horizon profile if it exists."""
-    if HORIZON_PROFILE_FILE.exists():
-        try:
-            with open(HORIZON_PROFILE_FILE) as f:
-                data = json.load(f)
-                return data.get("horizon", {})
-        except (json.JSONDecodeError, IOError):
-            return None
-    return None
+    """
+    Load cached horizon profile if it exists.
+    The file is only re-read when its mtime changes; treat the result as read-only.
+    """
+    try:
+        mtime = HORIZON_PROFILE_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _load_horizon_profile_cached(mtime)
+
+
+@lru_cache(maxsize=1)
+def _load_horizon_profile_cached(mtime: int) -> Optional[Dict]:
+    """Parse the horizon profile; keyed on mtime so regenerated files are picked up."""
+    try:
+        with open(HORIZON_PROFILE_FILE) as f:
+            data = json.load(f)
+            return data.get("horizon", {})
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+# Concurrent Open-Elevation requests; kept small to stay polite to the public API
+ELEVATION_API_WORKERS = 4
+ELEVATION_API_HOST = "api.open-elevation.com"
+ELEVATION_API_PATH = "/api/v1/lookup"
+
+_http_local = threading.local()  # Per-thread keep-alive connection
+
+_elevation_cache: Optional[Dict[str, float]] = None
+_elevation_cache_dirty = False
+_elevation_cache_lock = threading.Lock()
 
 
 def destination_point(
@@ -312,30 +753,49 @@ def destination_point(
     Returns:
         tuple: (latitude, longitude) of destination point
     """
-    R = 6371  # Earth's radius in km
+    return destination_points(lat, lon, [bearing], [distance_km])[0]
 
-    lat_rad = math.radians(lat)
-    lon_rad = math.radians(lon)
-    bearing_rad = math.radians(bearing)
 
-    d = distance_km / R  # Angular distance
+def destination_points(
+    lat: float, lon: float, bearings: List[float], distances_km: List[float]
+) -> List[Tuple[float, float]]:
+    """
+    Destination points for every bearing × distance pair, bearing-major.
 
-    dest_lat = math.asin(
-        math.sin(lat_rad) * math.cos(d)
-        + math.cos(lat_rad) * math.sin(d) * math.cos(bearing_rad)
-    )
+    The trig of the start latitude, each bearing and each distance is computed
+    once instead of once per point.
+    """
+    R = 6371  # Earth's radius in km
 
-    dest_lon = lon_rad + math.atan2(
-        math.sin(bearing_rad) * math.sin(d) * math.cos(lat_rad),
-        math.cos(d) - math.sin(lat_rad) * math.sin(dest_lat),
-    )
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    sin_lat = math.sin(lat_rad)
+    cos_lat = math.cos(lat_rad)
+
+    # Angular distances
+    distance_terms = [(math.sin(dist / R), math.cos(dist / R)) for dist in distances_km]
+
+    points = []
+    for bearing in bearings:
+        bearing_rad = math.radians(bearing)
+        sin_bearing = math.sin(bearing_rad)
+        cos_bearing = math.cos(bearing_rad)
+
+        for sin_d, cos_d in distance_terms:
+            sin_dest_lat = sin_lat * cos_d + cos_lat * sin_d * cos_bearing
+            dest_lat = math.asin(sin_dest_lat)
+            dest_lon = lon_rad + math.atan2(
+                sin_bearing * sin_d * cos_lat, cos_d - sin_lat * sin_dest_lat
+            )
+            points.append((math.degrees(dest_lat), math.degrees(dest_lon)))
 
-    return math.degrees(dest_lat), math.degrees(dest_lon)
+    return points
 
 
 def query_elevations(locations: List[Tuple[float, float]]) -> List[Optional[float]]:
     """
     Query Open-Elevation API for multiple locations.
+    Elevations already in the on-disk cache are not requested again.
 
     Args:
         locations: List of (lat, lon) tuples
@@ -343,35 +803,113 @@ def query_elevations(locations: List[Tuple[float, float]]) -> List[Optional[floa
     Returns:
         List of elevations in meters (or None for failed queries)
     """
+    global _elevation_cache_dirty
     if not locations:
         return []
 
+    cache = _load_elevation_cache()
+    keys = [f"{lat:.5f},{lon:.5f}" for lat, lon in locations]
+    misses = [i for i, key in enumerate(keys) if key not in cache]
+    if not misses:
+        return [cache[key] for key in keys]
+
+    fetched = _fetch_elevations([locations[i] for i in misses])
+    elevations = [cache.get(key) for key in keys]
+    for i, elev in zip(misses, fetched):
+        elevations[i] = elev
+        if elev is not None:  # Failures are retried next time
+            cache[keys[i]] = elev
+            _elevation_cache_dirty = True
+
+    return elevations
+
+
+def _fetch_elevations(locations: List[Tuple[float, float]]) -> List[Optional[float]]:
+    """POST locations to the Open-Elevation API."""
+    import http.client
+
     # Build request payload
     payload = {
         "locations": [{"latitude": lat, "longitude": lon} for lat, lon in locations]
     }
 
     try:
-        req = urllib.request.Request(
-            "https://api.open-elevation.com/api/v1/lookup",
-            data=json.dumps(payload).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-
-        with urllib.request.urlopen(req, timeout=30) as response:
-            data = json.load(response)
-            return [r.get("elevation") for r in data.get("results", [])]
+        data = _post_json(ELEVATION_API_PATH, json.dumps(payload).encode("utf-8"))
+        return [r.get("elevation") for r in data.get("results", [])]
 
-    except (urllib.error.URLError, json.JSONDecodeError, TimeoutError) as e:
+    except (OSError, http.client.HTTPException, json.JSONDecodeError) as e:
         print(f"  Error querying elevation API: {e}")
         return [None] * len(locations)
 
 
+def _post_json(path: str, body: bytes) -> dict:
+    """
+    POST a JSON body to the elevation API and decode the JSON reply.
+    Each thread keeps its HTTPS connection open, so later batches skip the
+    TCP/TLS handshake. A kept-alive connection the server has since closed is
+    reopened and the request retried once; a timeout is not retried.
+    """
+    import http.client
+    import socket
+
+    while True:
+        connection = getattr(_http_local, "connection", None)
+        reused = connection is not None
+        if not reused:
+            connection = http.client.HTTPSConnection(ELEVATION_API_HOST, timeout=30)
+            _http_local.connection = connection
+
+        try:
+            connection.request(
+                "POST", path, body=body, headers={"Content-Type": "application/json"}
+            )
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            _http_local.connection = None
+            if reused and not isinstance(e, socket.timeout):
+                continue
+            raise
+
+        if response.status != 200:
+            raise http.client.HTTPException(
+                f"HTTP Error {response.status}: {response.reason}"
+            )
+        return json.loads(data)
+
+
+def _load_elevation_cache() -> Dict[str, float]:
+    """
+    Elevations fetched by earlier runs, keyed by "lat,lon" rounded to 5 decimals (~1 m).
+    Loaded once per process; new entries are written back at exit.
+    """
+    global _elevation_cache
+    with _elevation_cache_lock:
+        if _elevation_cache is None:
+            try:
+                with open(ELEVATION_CACHE_FILE) as f:
+                    _elevation_cache = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                _elevation_cache = {}
+            atexit.register(_save_elevation_cache)
+    return _elevation_cache
+
+
+def _save_elevation_cache():
+    """Write the elevation cache back to disk if it gained entries."""
+    if not _elevation_cache_dirty:
+        return
+    try:
+        _write_cache_file(ELEVATION_CACHE_FILE, json.dumps(_elevation_cache))
+    except IOError:
+        pass  # Unwritable cache dir; the next run just re-fetches
+
+
 def calculate_horizon_profile(
-    lat: float = LATITUDE,
-    lon: float = LONGITUDE,
-    observer_elevation: float = ELEVATION,
+    lat: float = None,
+    lon: float = None,
+    observer_elevation: float = None,
     azimuth_step: int = 5,
     distances_km: List[float] = None,
 ) -> Dict[str, float]:
@@ -379,14 +917,22 @@ def calculate_horizon_profile(
     Calculate horizon profile by sampling elevations in all directions.
 
     Args:
-        lat, lon: Observer location
-        observer_elevation: Observer elevation in feet
+        lat, lon: Observer location (default: configured location)
+        observer_elevation: Observer elevation in feet (default: configured elevation)
         azimuth_step: Degrees between azimuth samples (default 5°)
         distances_km: Distances to sample at (default [0.1, 0.25, 0.5, 1, 2, 5, 10])
 
     Returns:
         Dict mapping azimuth (as string) to horizon angle in degrees
     """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if lat is None:
+        lat = LATITUDE
+    if lon is None:
+        lon = LONGITUDE
+    if observer_elevation is None:
+        observer_elevation = ELEVATION
     if distances_km is None:
         distances_km = [0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
 
@@ -400,58 +946,53 @@ def calculate_horizon_profile(
     print()
 
     # Build all sample points
-    sample_points = []
-    point_info = []  # (azimuth, distance_km)
-
-    for azimuth in range(0, 360, azimuth_step):
-        for dist in distances_km:
-            dest_lat, dest_lon = destination_point(lat, lon, azimuth, dist)
-            sample_points.append((dest_lat, dest_lon))
-            point_info.append((azimuth, dist))
+    sample_points = destination_points(
+        lat, lon, range(0, 360, azimuth_step), distances_km
+    )
 
-    # Query elevations in batches (API may have limits)
+    # Query elevations in batches (API may have limits). The requests are
+    # network-bound, so a few run concurrently; results come back in order.
     print("Fetching elevation data from Open-Elevation API...")
     batch_size = 100
+    batches = [
+        sample_points[i : i + batch_size]
+        for i in range(0, len(sample_points), batch_size)
+    ]
     all_elevations = []
 
-    for i in range(0, len(sample_points), batch_size):
-        batch = sample_points[i : i + batch_size]
-        print(
-            f"  Batch {i // batch_size + 1}/{(len(sample_points) + batch_size - 1) // batch_size}..."
-        )
-        elevations = query_elevations(batch)
-        all_elevations.extend(elevations)
+    with ThreadPoolExecutor(max_workers=ELEVATION_API_WORKERS) as executor:
+        for number, elevations in enumerate(
+            executor.map(query_elevations, batches), start=1
+        ):
+            print(f"  Batch {number}/{len(batches)}...")
+            all_elevations.extend(elevations)
 
-    # Calculate horizon angle for each azimuth
+    # Calculate horizon angle for each azimuth. Samples are laid out azimuth-major,
+    # so each azimuth owns one contiguous row of len(distances_km) elevations.
+    # atan is monotonic, so only the steepest slope per row needs converting.
     horizon = {}
+    distances_m = [dist * 1000 for dist in distances_km]
+    row_length = len(distances_m)
 
-    for azimuth in range(0, 360, azimuth_step):
-        max_angle = 0.0
+    for row, azimuth in enumerate(range(0, 360, azimuth_step)):
+        elevations = all_elevations[row * row_length : (row + 1) * row_length]
+        max_slope = 0.0
+        for elev, dist_m in zip(elevations, distances_m):
+            if elev is not None:
+                max_slope = max(max_slope, (elev - observer_elev_m) / dist_m)
 
-        for i, (az, dist) in enumerate(point_info):
-            if az != azimuth:
-                continue
-
-            elev = all_elevations[i]
-            if elev is None:
-                continue
-
-            # Calculate angle to this point
-            elev_diff = elev - observer_elev_m
-            dist_m = dist * 1000
-
-            # Angle = atan(elevation_difference / distance)
-            angle = math.degrees(math.atan2(elev_diff, dist_m))
-            max_angle = max(max_angle, angle)
-
-        # Only store if there's meaningful obstruction (> 0.5°)
-        horizon[str(azimuth)] = round(max(0, max_angle), 1)
+        horizon[str(azimuth)] = round(math.degrees(math.atan(max_slope)), 1)
 
     return horizon
 
 
-def save_horizon_profile(horizon: dict, lat: float = LATITUDE, lon: float = LONGITUDE):
+def save_horizon_profile(horizon: dict, lat: float = None, lon: float = None):
     """Save horizon profile to cache file."""
+    if lat is None:
+        lat = LATITUDE
+    if lon is None:
+        lon = LONGITUDE
+
     data = {
         "generated": datetime.now().isoformat(),
         "location": {"latitude": lat, "longitude": lon, "elevation_ft": ELEVATION},
@@ -504,8 +1045,13 @@ def print_horizon_profile(horizon: dict):
     print("=" * 70)
 
 
+# Field of view of the window opening (degrees), centred on the window azimuth
+WINDOW_FOV = 140
+_HALF_FOV = WINDOW_FOV / 2
+
+
 def can_sun_enter_window(
-    sun_az: float, sun_alt: float, window_az: float, window_fov: float = 140
+    sun_az: float, sun_alt: float, window_az: float, window_fov: float = WINDOW_FOV
 ) -> tuple[bool, float]:
     """
     Determine if sun can shine through window.
@@ -533,15 +1079,24 @@ def can_sun_enter_window(
 def analyze_glare(
     sun_az: float,
     sun_alt: float,
-    window_az: float = WINDOW_AZIMUTH,
-    monitor_facing: float = MONITOR_FACING,
+    window_az: float = None,
+    monitor_facing: float = None,
+    horizon_lut: Optional[array] = None,
 ) -> dict:
     """
     Analyze glare on monitor from sun through window.
 
     Key insight: Low sun angle is the primary glare factor. When sun is below ~15°,
     it streams in at eye level and creates harsh direct/reflected glare on screens.
+
+    Callers analyzing many positions can pass horizon_lut (from _horizon_lut())
+    so the horizon profile is only checked once.
     """
+    if window_az is None:
+        window_az = WINDOW_AZIMUTH
+    if monitor_facing is None:
+        monitor_facing = MONITOR_FACING
+
     # Sun must be above horizon
     if sun_alt <= 0:
         return {
@@ -553,7 +1108,9 @@ def analyze_glare(
         }
 
     # Check if sun is blocked by terrain (hills, buildings)
-    if is_sun_blocked_by_terrain(sun_az, sun_alt):
+    if horizon_lut is None:
+        horizon_lut = _horizon_lut()
+    if sun_alt < horizon_lut[_azimuth_bucket(sun_az)]:
         return {
             "status": "blocked_by_terrain",
             "can_enter_window": False,
@@ -574,25 +1131,74 @@ def analyze_glare(
             "recommendation": "blinds_open",
         }
 
+    glare_risk = _glare_risk(sun_alt, entry_angle)
+
+    # Determine status and recommendation
+    if glare_risk > 60:
+        status = "high_glare"
+        recommendation = "blinds_closed"
+    elif glare_risk > 35:
+        status = "moderate_glare"
+        recommendation = "blinds_partial"
+    else:
+        status = "low_glare"
+        recommendation = "blinds_open"
+
+    return {
+        "status": status,
+        "can_enter_window": True,
+        "entry_angle": round(entry_angle, 1),
+        "sun_altitude": round(sun_alt, 1),
+        "glare_risk": round(glare_risk, 1),
+        "recommendation": recommendation,
+    }
+
+
+def glare_risks(
+    azimuths: List[float], altitudes: List[float], window_az: float = None
+) -> List[float]:
+    """
+    Glare risk for each sun position, equal to analyze_glare()["glare_risk"].
+    Skips building the full result dict, for scans over many samples.
+    """
+    if window_az is None:
+        window_az = WINDOW_AZIMUTH
+    horizon_lut = _horizon_lut()
+
+    risks = []
+    for sun_az, sun_alt in zip(azimuths, altitudes):
+        # Inlined is_sun_blocked_by_terrain() against the table fetched above
+        bucket = int(sun_az * _BUCKETS_PER_DEGREE) % _AZIMUTH_BUCKETS
+        if sun_alt <= 0 or sun_alt < horizon_lut[bucket]:
+            risks.append(0)
+            continue
+
+        # Inlined can_sun_enter_window() with the default field of view
+        entry_angle = angle_difference(sun_az, window_az)
+        if entry_angle <= _HALF_FOV:
+            risks.append(round(_glare_risk(sun_alt, entry_angle), 1))
+        else:
+            risks.append(0)
+
+    return risks
+
+
+def _glare_risk(sun_alt: float, entry_angle: float) -> float:
+    """
+    Glare risk (0-100) for sun at sun_alt entering the window entry_angle degrees
+    off perpendicular. Plain float math with no dict building, cheap to call per sample.
+    """
     # GLARE MODEL
     # Factor 1: Sun altitude - LOW SUN IS THE KILLER
     # Below 10° = maximum glare (streaming rays at eye/monitor level)
     # 10-20° = decreasing glare
     # Above 25° = minimal glare (sun too high to stream in)
-    if sun_alt < 10:
-        altitude_factor = 1.0
-    elif sun_alt < 25:
-        altitude_factor = (25 - sun_alt) / 15
-    else:
-        altitude_factor = 0.0
+    altitude_factor = _clamp01((25.0 - sun_alt) / 15.0)
 
     # Factor 2: Entry angle - how directly sun enters window
     # At 0° = sun perpendicular to window (worst glare)
     # At 60°+ = sun at wide angle, minimal direct entry
-    if entry_angle < 60:
-        entry_factor = (60 - entry_angle) / 60
-    else:
-        entry_factor = 0.0
+    entry_factor = _clamp01((60.0 - entry_angle) / 60.0)
 
     # Combined glare risk - both factors must align for significant glare
     # Low sun streaming directly through window = worst case
@@ -603,35 +1209,20 @@ def analyze_glare(
 
     # Boost when both factors align (multiplicative bonus)
     if altitude_factor > 0.5 and entry_factor > 0.5:
-        glare_risk = min(100, glare_risk * 1.3)
+        glare_risk *= 1.3
 
-    glare_risk = min(100, max(0, glare_risk))
+    return min(100, max(0, glare_risk))
 
-    # Determine status and recommendation
-    if glare_risk > 60:
-        status = "high_glare"
-        recommendation = "blinds_closed"
-    elif glare_risk > 35:
-        status = "moderate_glare"
-        recommendation = "blinds_partial"
-    else:
-        status = "low_glare"
-        recommendation = "blinds_open"
 
-    return {
-        "status": status,
-        "can_enter_window": True,
-        "entry_angle": round(entry_angle, 1),
-        "sun_altitude": round(sun_alt, 1),
-        "glare_risk": round(glare_risk, 1),
-        "recommendation": recommendation,
-    }
+def _clamp01(x: float) -> float:
+    """Clamp x to [0, 1] (cheaper than max(0.0, min(1.0, x)))."""
+    return 0.0 if x < 0.0 else 1.0 if x > 1.0 else x
 
 
 def print_sun_info(dt: datetime = None):
     """Print current sun position and glare analysis."""
     if dt is None:
-        dt = datetime.now(ZoneInfo(TIMEZONE))
+        dt = datetime.now(_TZ)
 
     azimuth, altitude = sun_position(dt, LATITUDE, LONGITUDE)
     glare = analyze_glare(azimuth, altitude)
@@ -642,9 +1233,9 @@ def print_sun_info(dt: datetime = None):
     print(f"Location: {LATITUDE:.4f}°N, {abs(LONGITUDE):.4f}°W")
     print(f"{'=' * 60}")
     print(f"Room Setup:")
-    print(f"  Window faces:  {WINDOW_AZIMUTH}° ({compass_direction(WINDOW_AZIMUTH)})")
-    print(f"  Monitor faces: {MONITOR_FACING}° ({compass_direction(MONITOR_FACING)})")
-    print(f"  User faces:    {USER_FACING}° ({compass_direction(USER_FACING)})")
+    print(f"  Window faces:  {WINDOW_AZIMUTH}° ({_WINDOW_COMPASS})")
+    print(f"  Monitor faces: {MONITOR_FACING}° ({_MONITOR_COMPASS})")
+    print(f"  User faces:    {USER_FACING}° ({_USER_COMPASS})")
     print(f"{'=' * 60}")
     print(f"Sun Azimuth:  {azimuth:6.1f}° ({compass_direction(azimuth)})")
     print(f"Sun Altitude: {altitude:6.1f}°", end="")
@@ -676,16 +1267,33 @@ def print_sun_info(dt: datetime = None):
     return azimuth, altitude, glare
 
 
+# Slack for approx_sunrise() when skipping pre-dawn samples
+_SUNRISE_MARGIN = timedelta(minutes=15)
+
+
+# Timeline marker for each analyze_glare() status
+_STATUS_ICONS = {
+    "night": "    ",
+    "blocked_by_terrain": " \u2587\u2587 ",
+    "no_direct_sun": " -- ",
+    "low_glare": " OK ",
+    "moderate_glare": " !! ",
+    "high_glare": ">>>>",
+}
+
+
 def show_morning_timeline(date: datetime = None):
     """Show sun positions throughout the morning with blind recommendations."""
     if date is None:
-        date = datetime.now(ZoneInfo(TIMEZONE))
+        date = datetime.now(_TZ)
+    elif date.tzinfo is None:
+        date = date.replace(tzinfo=_TZ)
 
     print(f"\n{'=' * 85}")
     print(f"Morning Timeline - {date.strftime('%Y-%m-%d')}")
     print(
-        f"Window: {WINDOW_AZIMUTH}° ({compass_direction(WINDOW_AZIMUTH)}) | "
-        f"Monitor: {MONITOR_FACING}° ({compass_direction(MONITOR_FACING)})"
+        f"Window: {WINDOW_AZIMUTH}° ({_WINDOW_COMPASS}) | "
+        f"Monitor: {MONITOR_FACING}° ({_MONITOR_COMPASS})"
     )
     print(f"{'=' * 85}")
     print(
@@ -693,33 +1301,42 @@ def show_morning_timeline(date: datetime = None):
     )
     print(f"{'-' * 85}")
 
-    for hour in range(5, 13):
-        for minute in [0, 30]:
-            dt = date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            az, alt = sun_position(dt, LATITUDE, LONGITUDE)
-            glare = analyze_glare(az, alt)
-
-            if alt > -5:  # Show from just before sunrise
-                day_open = calculate_day_blind(glare["glare_risk"])
-                step = get_blind_step(day_open)
-
-                status_icon = {
-                    "night": "    ",
-                    "blocked_by_terrain": " \u2587\u2587 ",
-                    "no_direct_sun": " -- ",
-                    "low_glare": " OK ",
-                    "moderate_glare": " !! ",
-                    "high_glare": ">>>>",
-                }.get(glare["status"], "")
-
-                print(
-                    f"{dt.strftime('%H:%M'):>8} | {az:5.0f}° {compass_direction(az):>4} | "
-                    f"{alt:5.1f}° | {glare['glare_risk']:5.1f}% | {day_open:>3}% | {step:<14} | {status_icon} {glare['status']}"
-                )
+    times = [
+        date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        for hour in range(5, 13)
+        for minute in [0, 30]
+    ]
+    # Rows start just before sunrise (altitude -5°); skip the slots before that
+    first_row = approx_sunrise(date, LATITUDE, LONGITUDE, altitude=-5)
+    if first_row is not None:
+        times = [dt for dt in times if dt > first_row - _SUNRISE_MARGIN]
+    azimuths, altitudes = sun_position_batch(times, LATITUDE, LONGITUDE)
+
+    # Format every row first, then write the table in one go
+    rows = []
+    horizon_lut = _horizon_lut()
+    for dt, az, alt in zip(times, azimuths, altitudes):
+        if alt <= -5:  # Show from just before sunrise
+            continue
+
+        glare = analyze_glare(az, alt, horizon_lut=horizon_lut)
+        day_open = calculate_day_blind(glare["glare_risk"])
+        step = get_blind_step(day_open)
+        status_icon = _STATUS_ICONS.get(glare["status"], "")
+
+        rows.append(
+            f"{dt.strftime('%H:%M'):>8} | {az:5.0f}° {compass_direction(az):>4} | "
+            f"{alt:5.1f}° | {glare['glare_risk']:5.1f}% | {day_open:>3}% | {step:<14} | {status_icon} {glare['status']}\n"
+        )
 
+    sys.stdout.write("".join(rows))
     print(f"{'=' * 85}\n")
 
 
+_YEARLY_SLOT = timedelta(minutes=15)
+_YEARLY_SLOT_DAYS = _YEARLY_SLOT / timedelta(days=1)
+
+
 def show_yearly_glare_windows():
     """Show when glare occurs throughout the year."""
     print(f"\n{'=' * 75}")
@@ -730,50 +1347,91 @@ def show_yearly_glare_windows():
     )
     print(f"{'-' * 75}")
 
+    # The table only depends on the year, the config, the horizon profile and
+    # this code, so it is computed once and then read back from the cache
     current_year = datetime.now().year
-    for month in range(1, 13):
-        # Use 15th of each month
-        date = datetime(current_year, month, 15, tzinfo=ZoneInfo(TIMEZONE))
-        month_name = date.strftime("%B")
-
-        glare_start = None
-        glare_end = None
-        peak_risk = 0
-        peak_time = None
-
-        # Check every 15 minutes from 5 AM to 12 PM
-        for hour in range(5, 13):
-            for minute in range(0, 60, 15):
-                dt = date.replace(hour=hour, minute=minute)
-                az, alt = sun_position(dt, LATITUDE, LONGITUDE)
-                glare = analyze_glare(az, alt)
-
-                if glare["glare_risk"] > peak_risk:
-                    peak_risk = glare["glare_risk"]
-                    peak_time = dt
-
-                if glare["glare_risk"] > 50:  # Significant glare
-                    if glare_start is None:
-                        glare_start = dt
-                    glare_end = dt
-
-        if glare_start and glare_end:
-            duration_mins = (glare_end - glare_start).seconds // 60
-            duration_str = f"{duration_mins // 60}h {duration_mins % 60}m"
-            print(
-                f"{month_name:>10} | {glare_start.strftime('%H:%M'):>12} | "
-                f"{glare_end.strftime('%H:%M'):>12} | {duration_str:>10} | "
-                f"{peak_risk:.0f}% @ {peak_time.strftime('%H:%M')}"
-            )
-        else:
-            print(
-                f"{month_name:>10} | {'--':>12} | {'--':>12} | {'--':>10} | "
-                f"{peak_risk:.0f}%"
-            )
+    key = " ".join(
+        str(part)
+        for part in (
+            current_year,
+            _mtime_ns(CONFIG_FILE),
+            _mtime_ns(HORIZON_PROFILE_FILE),
+            _mtime_ns(Path(__file__)),
+        )
+    )
+    rows = _read_yearly_cache(key)
+    if rows is None:
+        rows = [_yearly_glare_row(current_year, month) for month in range(1, 13)]
+        _write_yearly_cache(key, rows)
 
+    sys.stdout.write("".join(rows))
     print(f"{'=' * 75}\n")
 
 
+def _yearly_glare_row(year: int, month: int) -> str:
+    """Table row (with newline) for glare on the 15th of a month."""
+    date = datetime(year, month, 15, tzinfo=_TZ)
+    month_name = date.strftime("%B")
+
+    # Check every 15 minutes from 5 AM to 12 PM, skipping slots before
+    # sunrise since they can't have glare
+    start = date.replace(hour=5)
+    first_slot = 0
+    sunrise = approx_sunrise(date, LATITUDE, LONGITUDE, altitude=0)
+    if sunrise is not None:
+        skipped = (sunrise - _SUNRISE_MARGIN - start) / _YEARLY_SLOT
+        first_slot = max(0, math.floor(skipped) + 1)
+    slots = range(first_slot, 32)
+
+    # The slot grid is evenly spaced, so its Julian Days are plain arithmetic
+    start_jd = _local_to_jd(start)
+    jds = [start_jd + i * _YEARLY_SLOT_DAYS for i in slots]
+    azimuths, altitudes = sun_position_batch_jd(jds, LATITUDE, LONGITUDE)
+    risks = glare_risks(azimuths, altitudes)
+
+    # Reduce to the peak and the first/last significant (> 50%) slots;
+    # datetimes are only built for the slots that get printed
+    peak_risk = max(risks, default=0)
+    significant = [i for i, risk in enumerate(risks) if risk > 50]
+
+    if not significant:
+        return (
+            f"{month_name:>10} | {'--':>12} | {'--':>12} | {'--':>10} | "
+            f"{peak_risk:.0f}%\n"
+        )
+
+    glare_start = start + _YEARLY_SLOT * slots[significant[0]]
+    glare_end = start + _YEARLY_SLOT * slots[significant[-1]]
+    peak_time = start + _YEARLY_SLOT * slots[risks.index(peak_risk)]
+    duration_mins = (glare_end - glare_start).seconds // 60
+    duration_str = f"{duration_mins // 60}h {duration_mins % 60}m"
+    return (
+        f"{month_name:>10} | {glare_start.strftime('%H:%M'):>12} | "
+        f"{glare_end.strftime('%H:%M'):>12} | {duration_str:>10} | "
+        f"{peak_risk:.0f}% @ {peak_time.strftime('%H:%M')}\n"
+    )
+
+
+def _read_yearly_cache(key: str) -> Optional[List[str]]:
+    """Return the cached yearly table rows if they were made for this key."""
+    try:
+        with open(YEARLY_CACHE_FILE) as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    return data.get("rows")
+
+
+def _write_yearly_cache(key: str, rows: List[str]):
+    """Save the yearly table rows for later runs."""
+    try:
+        _write_cache_file(YEARLY_CACHE_FILE, json.dumps({"key": key, "rows": rows}))
+    except IOError:
+        pass  # Unwritable cache dir; the table is just recomputed next time
+
+
 def calculate_day_blind(glare_risk: float) -> int:
     """
     Calculate day blind open percentage based on glare risk.
@@ -810,10 +1468,8 @@ def get_blind_step(day_open: int) -> str:
     """
     Convert day blind percentage to a discrete step name for Shortcuts.
     """
-    for threshold, name in reversed(BLIND_STEPS):
-        if day_open >= threshold:
-            return name
-    return BLIND_STEPS[0][1]  # Default to first step
+    index = bisect_right(_STEP_THRESHOLDS, day_open) - 1
+    return _STEP_NAMES[max(index, 0)]  # Default to lowest step
 
 
 def run_blind_shortcut(step: str, dry_run: bool = False) -> tuple[bool, str]:
@@ -858,15 +1514,30 @@ def run_blind_shortcut(step: str, dry_run: bool = False) -> tuple[bool, str]:
 
 
 def get_blinds_recommendation() -> dict:
-    """Get current blinds recommendation - for automation use."""
-    now = datetime.now(ZoneInfo(TIMEZONE))
+    """
+    Get current blinds recommendation - for automation use.
+
+    Evaluated at the start of the current RECOMMENDATION_INTERVAL and kept in
+    the state file until it ends, so CLI modes polled within one interval
+    (auto, status, step, ...) compute it only once and always agree.
+    """
+    now = datetime.fromtimestamp(
+        datetime.now().timestamp() // RECOMMENDATION_INTERVAL * RECOMMENDATION_INTERVAL,
+        _TZ,
+    )
+    key = _recommendation_key(now)
+    state = _read_state()
+    cached = state.get("recommendation")
+    if isinstance(cached, dict) and cached.get("key") == key:
+        return cached["result"]
+
     az, alt = sun_position(now, LATITUDE, LONGITUDE)
     glare = analyze_glare(az, alt)
 
     day_open = calculate_day_blind(glare["glare_risk"])
     step = get_blind_step(day_open)
 
-    return {
+    result = {
         "timestamp": now.isoformat(),
         "sun_azimuth": round(az, 1),
         "sun_altitude": round(alt, 1),
@@ -875,12 +1546,55 @@ def get_blinds_recommendation() -> dict:
         "day_open": day_open,
         "step": step,
     }
+    state["recommendation"] = {"key": key, "result": result}
+    _write_state(state)
+    return result
 
 
-if __name__ == "__main__":
-    import json
-    import sys
+def _recommendation_key(now: datetime) -> str:
+    """
+    Cache key for a recommendation: its evaluation time plus the config and
+    horizon profile mtimes, so editing either invalidates it.
+    """
+    mtimes = f"{_mtime_ns(CONFIG_FILE)} {_mtime_ns(HORIZON_PROFILE_FILE)}"
+    return f"{now.isoformat()} {mtimes}"
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    """File modification time in nanoseconds, or None if it doesn't exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
 
+
+def _read_state() -> dict:
+    """
+    Load the automation state file: the last recommendation and the last step
+    sent to the Shortcut.
+    """
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    if not isinstance(state, dict):
+        return {}
+    last_run_ts = state.get("last_run_ts")
+    if not isinstance(last_run_ts, (int, float)) or not math.isfinite(last_run_ts):
+        state.pop("last_run_ts", None)  # Treated as never run
+    return state
+
+
+def _write_state(state: dict):
+    """Save the automation state file."""
+    try:
+        _write_cache_file(STATE_FILE, json.dumps(state))
+    except IOError:
+        pass  # Unwritable cache dir; the state just isn't remembered
+
+
+if __name__ == "__main__":
     # CLI modes
     if len(sys.argv) > 1:
         mode = sys.argv[1]
@@ -889,8 +1603,22 @@ if __name__ == "__main__":
             # Automatically adjust blinds by running the appropriate Shortcut
             result = get_blinds_recommendation()
             step = result["step"]
-            success, message = run_blind_shortcut(step)
-            timestamp = datetime.now(ZoneInfo(TIMEZONE)).strftime("%Y-%m-%d %H:%M:%S")
+            # Only run the Shortcut when the step changes (or to refresh it)
+            now = datetime.now(_TZ)
+            state = _read_state()
+            since_last_run = now.timestamp() - state.get("last_run_ts", 0)
+            if (
+                state.get("last_step") == step
+                and since_last_run < SHORTCUT_REFRESH_INTERVAL
+            ):
+                success, message = True, f"Blinds already at level '{step}'"
+            else:
+                success, message = run_blind_shortcut(step)
+                if success:
+                    state["last_step"] = step
+                    state["last_run_ts"] = now.timestamp()
+                    _write_state(state)
+            timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
             print(
                 f"[{timestamp}] {message} (glare: {result['glare_risk']:.0f}%, step: {step})"
             )
@@ -953,9 +1681,9 @@ Location:
   Timezone:   {TIMEZONE}
 
 Room Setup:
-  Window:     {WINDOW_AZIMUTH}° ({compass_direction(WINDOW_AZIMUTH)})
-  Monitor:    {MONITOR_FACING}° ({compass_direction(MONITOR_FACING)})
-  User:       {USER_FACING}° ({compass_direction(USER_FACING)})
+  Window:     {WINDOW_AZIMUTH}° ({_WINDOW_COMPASS})
+  Monitor:    {MONITOR_FACING}° ({_MONITOR_COMPASS})
+  User:       {USER_FACING}° ({_USER_COMPASS})
 
 Day Blind Settings:
   Range:           {DAY_BLIND_MIN_OPEN}% - {DAY_BLIND_MAX_OPEN}% open
@@ -1048,9 +1776,10 @@ Setup:
             print(f"Unknown mode: {mode}. Use 'help' for options.")
             sys.exit(1)
     else:
-        # Interactive mode - full analysis
-        print_sun_info()
-        show_morning_timeline()
+        # Interactive mode - full analysis (one clock reading for both reports)
+        now = datetime.now(_TZ)
+        print_sun_info(now)
+        show_morning_timeline(now)
         show_yearly_glare_windows()
 
         print("\n>>> For Shortcuts automation, run: python3 sun_position.py help")